@@ -0,0 +1,274 @@
+import re
+import sqlite3
+from bisect import bisect_left
+from datetime import datetime, timezone
+from itertools import accumulate
+
+
+class Analytics:
+    """Аналитика надежности автопарка по предрассчитанным сводным таблицам"""
+
+    # Верхние границы корзин времени решения заявки (в минутах)
+    RESOLUTION_BUCKETS = [15, 30, 60, 120, 240, 480, 720, 1440, 2880, 4320, 10080, 20160, 43200]
+
+    # Сколько заявок одного типа по одной машине считаем повторной поломкой
+    REPEAT_FAILURE_THRESHOLD = 2
+
+    # Версия формата сводных таблиц: при изменении таблицы пересчитываются заново
+    ROLLUPS_VERSION = 2
+
+    def __init__(self, db_name="taxi_bot.db"):
+        self.db_name = db_name
+
+    # === ОБНОВЛЕНИЕ СВОДНЫХ ТАБЛИЦ ===
+
+    @staticmethod
+    def init_tables(cursor):
+        """Создаем сводные таблицы если их нет"""
+        # Заявки по дням, маркам и типам проблем
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS daily_rollups (
+                day TEXT NOT NULL,
+                car_brand TEXT NOT NULL,
+                problem_type TEXT NOT NULL,
+                created INTEGER DEFAULT 0,
+                resolved INTEGER DEFAULT 0,
+                PRIMARY KEY (day, car_brand, problem_type)
+            )
+        ''')
+
+        # Заявки по машинам за месяц
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS car_monthly_rollups (
+                month TEXT NOT NULL,
+                car_number TEXT NOT NULL,
+                tickets INTEGER DEFAULT 0,
+                PRIMARY KEY (month, car_number)
+            )
+        ''')
+
+        # Итоги по марке и типу проблемы
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS brand_type_rollups (
+                car_brand TEXT NOT NULL,
+                problem_type TEXT NOT NULL,
+                tickets INTEGER DEFAULT 0,
+                PRIMARY KEY (car_brand, problem_type)
+            )
+        ''')
+
+        # Итоги по машине и типу проблемы (для поиска повторных поломок)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS car_type_rollups (
+                car_number TEXT NOT NULL,
+                problem_type TEXT NOT NULL,
+                car_brand TEXT NOT NULL,
+                tickets INTEGER DEFAULT 0,
+                last_created_at TIMESTAMP,
+                PRIMARY KEY (car_number, problem_type)
+            )
+        ''')
+
+        # Гистограмма времени решения заявок
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS resolution_histogram (
+                bucket INTEGER PRIMARY KEY,
+                tickets INTEGER DEFAULT 0
+            )
+        ''')
+
+        cursor.execute('PRAGMA user_version')
+        if cursor.fetchone()[0] < Analytics.ROLLUPS_VERSION:
+            Analytics.rebuild(cursor)
+            cursor.execute(f'PRAGMA user_version = {Analytics.ROLLUPS_VERSION}')
+
+    @staticmethod
+    def rebuild(cursor):
+        """Пересчитываем сводные таблицы по всей таблице problems"""
+        for table in ('daily_rollups', 'car_monthly_rollups', 'brand_type_rollups',
+                      'car_type_rollups', 'resolution_histogram'):
+            cursor.execute(f'DELETE FROM {table}')
+
+        cursor.execute('''
+            SELECT car_brand, car_number, problem_type, status, created_at, resolved_at
+            FROM problems
+        ''')
+        for car_brand, car_number, problem_type, status, created_at, resolved_at in cursor.fetchall():
+            Analytics.record_created(cursor, car_brand, car_number, problem_type, created_at)
+            if status == 'решено' and resolved_at:
+                Analytics.record_resolved(cursor, car_brand, problem_type, created_at, resolved_at, 1)
+
+    @staticmethod
+    def record_created(cursor, car_brand, car_number, problem_type, created_at):
+        """Учитываем новую заявку в сводных таблицах"""
+        created_at = str(created_at)
+        day, month = created_at[:10], created_at[:7]
+
+        cursor.execute('''
+            INSERT INTO daily_rollups (day, car_brand, problem_type, created) VALUES (?, ?, ?, 1)
+            ON CONFLICT (day, car_brand, problem_type) DO UPDATE SET created = created + 1
+        ''', (day, car_brand, problem_type))
+        cursor.execute('''
+            INSERT INTO car_monthly_rollups (month, car_number, tickets) VALUES (?, ?, 1)
+            ON CONFLICT (month, car_number) DO UPDATE SET tickets = tickets + 1
+        ''', (month, car_number))
+        cursor.execute('''
+            INSERT INTO brand_type_rollups (car_brand, problem_type, tickets) VALUES (?, ?, 1)
+            ON CONFLICT (car_brand, problem_type) DO UPDATE SET tickets = tickets + 1
+        ''', (car_brand, problem_type))
+        cursor.execute('''
+            INSERT INTO car_type_rollups (car_number, problem_type, car_brand, tickets, last_created_at)
+            VALUES (?, ?, ?, 1, ?)
+            ON CONFLICT (car_number, problem_type) DO UPDATE SET
+                tickets = tickets + 1,
+                last_created_at = MAX(last_created_at, excluded.last_created_at)
+        ''', (car_number, problem_type, car_brand, created_at))
+
+    @staticmethod
+    def record_resolved(cursor, car_brand, problem_type, created_at, resolved_at, delta):
+        """Учитываем решение заявки (delta=1) или его отмену (delta=-1). Оба времени в UTC"""
+        created = datetime.fromisoformat(str(created_at))
+        resolved = datetime.fromisoformat(str(resolved_at))
+        minutes = max((resolved - created).total_seconds() / 60, 0)
+        bucket = bisect_left(Analytics.RESOLUTION_BUCKETS, minutes)
+
+        cursor.execute('''
+            INSERT INTO daily_rollups (day, car_brand, problem_type, resolved) VALUES (?, ?, ?, ?)
+            ON CONFLICT (day, car_brand, problem_type) DO UPDATE SET resolved = resolved + excluded.resolved
+        ''', (str(resolved_at)[:10], car_brand, problem_type, delta))
+        cursor.execute('''
+            INSERT INTO resolution_histogram (bucket, tickets) VALUES (?, ?)
+            ON CONFLICT (bucket) DO UPDATE SET tickets = tickets + excluded.tickets
+        ''', (bucket, delta))
+
+    @staticmethod
+    def record_status_change(cursor, problem, status, resolved_at):
+        """Учитываем смену статуса заявки. problem - строка до изменения"""
+        car_brand, problem_type = problem[3], problem[5]
+        old_status, created_at, old_resolved_at = problem[7], problem[8], problem[9]
+
+        if old_status == 'решено' and old_resolved_at:
+            Analytics.record_resolved(cursor, car_brand, problem_type, created_at, old_resolved_at, -1)
+        if status == 'решено' and resolved_at:
+            Analytics.record_resolved(cursor, car_brand, problem_type, created_at, resolved_at, 1)
+
+    # === ОТЧЕТЫ ===
+
+    @staticmethod
+    def is_valid_month(month: str) -> bool:
+        """Месяц в формате 'ГГГГ-ММ'"""
+        return re.fullmatch(r"\d{4}-(0[1-9]|1[0-2])", month) is not None
+
+    @staticmethod
+    def percentiles(histogram, points=(50, 90, 95)):
+        """Перцентили времени решения (в минутах) по гистограмме корзин"""
+        counts = [histogram.get(i, 0) for i in range(len(Analytics.RESOLUTION_BUCKETS) + 1)]
+        cumulative = list(accumulate(counts))
+        total = cumulative[-1]
+        if total <= 0:
+            return {}
+
+        edges = Analytics.RESOLUTION_BUCKETS + [None]
+        return {p: edges[bisect_left(cumulative, total * p / 100)] for p in points}
+
+    def get_report(self, month=None):
+        """Собираем отчет по сводным таблицам. month - 'ГГГГ-ММ' (UTC), по умолчанию текущий"""
+        month = month or datetime.now(timezone.utc).strftime('%Y-%m')
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT bucket, tickets FROM resolution_histogram')
+        histogram = dict(cursor.fetchall())
+
+        cursor.execute('''
+            SELECT COUNT(*), COALESCE(SUM(tickets), 0) FROM car_monthly_rollups WHERE month = ?
+        ''', (month,))
+        cars, tickets = cursor.fetchone()
+
+        cursor.execute('''
+            SELECT car_number, tickets FROM car_monthly_rollups
+            WHERE month = ? ORDER BY tickets DESC, car_number LIMIT 10
+        ''', (month,))
+        top_cars = cursor.fetchall()
+
+        cursor.execute('''
+            SELECT day, SUM(created), SUM(resolved) FROM daily_rollups
+            WHERE day BETWEEN ? AND ? GROUP BY day ORDER BY day
+        ''', (f'{month}-01', f'{month}-31'))
+        daily = cursor.fetchall()
+
+        cursor.execute('''
+            SELECT car_brand, problem_type, MAX(tickets) FROM brand_type_rollups
+            GROUP BY car_brand ORDER BY car_brand
+        ''')
+        top_types = cursor.fetchall()
+
+        cursor.execute('''
+            SELECT car_brand, car_number, problem_type, tickets FROM car_type_rollups
+            WHERE tickets >= ? ORDER BY tickets DESC, last_created_at DESC LIMIT 10
+        ''', (self.REPEAT_FAILURE_THRESHOLD,))
+        repeat_failures = cursor.fetchall()
+
+        conn.close()
+        return {
+            'month': month,
+            'percentiles': self.percentiles(histogram),
+            'cars': cars,
+            'tickets_per_car': tickets / cars if cars else 0,
+            'top_cars': top_cars,
+            'daily': daily,
+            'top_types': top_types,
+            'repeat_failures': repeat_failures,
+        }
+
+    @staticmethod
+    def format_minutes(minutes):
+        """Форматировать верхнюю границу корзины времени решения"""
+        if minutes is None:
+            return f"более {Analytics.RESOLUTION_BUCKETS[-1] // 1440} дн"
+        if minutes < 60:
+            return f"до {minutes} мин"
+        if minutes < 1440:
+            return f"до {minutes // 60} ч"
+        return f"до {minutes // 1440} дн"
+
+    def get_report_message(self, month=None) -> str:
+        """Получить отчет в виде сообщения"""
+        report = self.get_report(month)
+        percentiles = report['percentiles']
+
+        message = "\n📈 Отчет по надежности автопарка\n\n⏱ Время решения заявок:\n"
+        if percentiles:
+            message += f"""• Медиана: {self.format_minutes(percentiles[50])}
+• 90%: {self.format_minutes(percentiles[90])}
+• 95%: {self.format_minutes(percentiles[95])}
+"""
+        else:
+            message += "• Нет решенных заявок\n"
+
+        message += f"""
+🚗 За {report['month']}:
+• Машин с заявками: {report['cars']}
+• Заявок на машину: {report['tickets_per_car']:.1f}
+"""
+        if report['top_cars']:
+            message += "\n🚕 Заявок по машинам:\n"
+            for car_number, tickets in report['top_cars']:
+                message += f"• {car_number}: {tickets}\n"
+
+        if report['daily']:
+            message += "\n📅 По дням (новые / решенные):\n"
+            for day, created, resolved in report['daily']:
+                message += f"• {day[8:]}: {created} / {resolved}\n"
+
+        if report['top_types']:
+            message += "\n🔧 Частые проблемы по маркам:\n"
+            for car_brand, problem_type, tickets in report['top_types']:
+                message += f"• {car_brand}: {problem_type} ({tickets})\n"
+
+        if report['repeat_failures']:
+            message += "\n🔁 Повторные поломки:\n"
+            for car_brand, car_number, problem_type, tickets in report['repeat_failures']:
+                message += f"• {car_brand} {car_number}: {problem_type} ×{tickets}\n"
+
+        return message
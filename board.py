@@ -0,0 +1,117 @@
+import hashlib
+import logging
+
+from telegram.error import BadRequest, NetworkError, RetryAfter
+from telegram.ext import Application, ContextTypes
+
+from config import Config
+from database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class ActiveBoard:
+    """Закрепленное сообщение со списком актуальных заявок, обновляемое на месте"""
+
+    MAX_LENGTH = 4000
+
+    def __init__(self, db: Database, application: Application):
+        self.db = db
+        self.application = application
+        self.boards = self.db.get_boards()  # admin_id -> message_id
+        self.hashes = {}  # admin_id -> хэш содержимого, успешно показанного на доске
+        self.job = None
+        self.db.add_listener(self.on_problem_changed)
+
+        # Пока бот был выключен, доски могли устареть
+        if self.boards:
+            self.schedule(0)
+
+    def render(self) -> str:
+        """Текст доски по актуальным заявкам"""
+        problems = self.db.get_problems('актуально')
+        text = f"📌 АКТУАЛЬНЫЕ ЗАЯВКИ ({len(problems)})\n\n"
+        if not problems:
+            return text + "📭 Нет актуальных заявок"
+
+        for index, problem in enumerate(problems):
+            line = f"🔴 #{problem[0]} {problem[3]} {problem[4]} — {problem[5]}\n"
+            if len(text) + len(line) > self.MAX_LENGTH:
+                text += f"… и еще {len(problems) - index}"
+                break
+            text += line
+        return text
+
+    def on_problem_changed(self, old_problem, new_problem):
+        """Откладываем обновление: изменения за время задержки объединяются в одно"""
+        if self.boards:
+            self.schedule(Config.BOARD_DEBOUNCE_SECONDS)
+
+    def schedule(self, delay: float):
+        """Планируем обновление досок, если оно еще не запланировано"""
+        if self.job:
+            return
+        self.job = self.application.job_queue.run_once(
+            self.refresh, when=delay, name="active_board", job_kwargs={'misfire_grace_time': None}
+        )
+
+    async def refresh(self, context: ContextTypes.DEFAULT_TYPE):
+        """Перерисовываем доски, содержимое которых изменилось"""
+        self.job = None
+        text = self.render()
+        content_hash = hashlib.sha256(text.encode()).hexdigest()
+        retry_delay = None
+
+        for admin_id, message_id in list(self.boards.items()):
+            if self.hashes.get(admin_id) == content_hash:
+                continue
+            try:
+                await context.bot.edit_message_text(text, chat_id=admin_id, message_id=message_id)
+            except BadRequest as e:
+                if "message to edit not found" in str(e).lower():
+                    # Доску удалили - больше ее не обновляем
+                    self.remove(admin_id)
+                    continue
+                # После перезапуска доска может уже показывать это содержимое
+                if "not modified" not in str(e).lower():
+                    logger.error(f"Не удалось обновить доску администратора {admin_id}: {e}")
+                    continue
+            except RetryAfter as e:
+                retry_delay = max(retry_delay or 0, e.retry_after)
+                continue
+            except NetworkError as e:
+                logger.warning(f"Не удалось обновить доску администратора {admin_id}: {e}")
+                retry_delay = max(retry_delay or 0, Config.BOARD_DEBOUNCE_SECONDS)
+                continue
+            except Exception as e:
+                logger.error(f"Не удалось обновить доску администратора {admin_id}: {e}")
+                continue
+            self.hashes[admin_id] = content_hash
+
+        # Доски, которые не удалось обновить, пробуем еще раз
+        if retry_delay is not None:
+            self.schedule(retry_delay)
+
+    def remove(self, admin_id: int):
+        """Забываем доску администратора"""
+        self.boards.pop(admin_id, None)
+        self.hashes.pop(admin_id, None)
+        self.db.delete_board(admin_id)
+
+    async def create(self, context: ContextTypes.DEFAULT_TYPE, admin_id: int):
+        """Отправляем и закрепляем новую доску, старая удаляется"""
+        old_message_id = self.boards.get(admin_id)
+        if old_message_id:
+            try:
+                await context.bot.delete_message(chat_id=admin_id, message_id=old_message_id)
+            except Exception as e:
+                logger.warning(f"Не удалось удалить старую доску администратора {admin_id}: {e}")
+
+        text = self.render()
+        message = await context.bot.send_message(chat_id=admin_id, text=text)
+        await context.bot.pin_chat_message(chat_id=admin_id, message_id=message.message_id,
+                                           disable_notification=True)
+
+        self.db.set_board(admin_id, message.message_id)
+        self.boards[admin_id] = message.message_id
+        self.hashes[admin_id] = hashlib.sha256(text.encode()).hexdigest()
@@ -3,9 +3,13 @@ from telegram import Update, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes, ConversationHandler, \
     CallbackQueryHandler
 
+from analytics import Analytics
+from board import ActiveBoard
 from config import Config
 from database import Database
+from escalation import EscalationEngine
 from keyboards import Keyboards
+from media_store import MediaStore
 from status_manager import StatusManager
 
 # Настройка логирования
@@ -20,8 +24,13 @@ class TaxiBot:
     def __init__(self):
         self.db = Database()
         self.status_manager = StatusManager(self.db)
+        self.analytics = Analytics(self.db.db_name)
+        self.media_store = MediaStore()
         self.application = Application.builder().token(Config.BOT_TOKEN).build()
+        self.escalation = EscalationEngine(self.db, self.application)
+        self.board = ActiveBoard(self.db, self.application)
         self.setup_handlers()
+        self.escalation.start()
 
     def setup_handlers(self):
         """Настраиваем обработчики команд"""
@@ -35,7 +44,10 @@ class TaxiBot:
                 CAR_BRAND: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.get_car_brand)],
                 CAR_NUMBER: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.get_car_number)],
                 PROBLEM_TYPE: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.get_problem_type)],
-                PROBLEM_DESCRIPTION: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.get_problem_description)],
+                PROBLEM_DESCRIPTION: [
+                    MessageHandler(filters.PHOTO | filters.VOICE, self.get_problem_attachment),
+                    MessageHandler(filters.TEXT & ~filters.COMMAND, self.get_problem_description)
+                ],
             },
             fallbacks=[MessageHandler(filters.Regex("❌ Отмена"), self.cancel)]
         )
@@ -43,6 +55,8 @@ class TaxiBot:
 
         # Команды для администратора
         self.application.add_handler(CommandHandler("admin", self.admin_panel))
+        self.application.add_handler(CommandHandler("report", self.show_report))
+        self.application.add_handler(CommandHandler("board", self.create_board))
         self.application.add_handler(MessageHandler(filters.Regex("📊 Статистика"), self.show_stats))
         self.application.add_handler(MessageHandler(filters.Regex("📋 Актуальные проблемы"), self.show_active_problems))
         self.application.add_handler(MessageHandler(filters.Regex("✅ Решенные проблемы"), self.show_resolved_problems))
@@ -172,12 +186,12 @@ class TaxiBot:
 
         if problem_type == "Другое":
             await update.message.reply_text(
-                "📝 Опишите проблему подробно:",
+                "📝 Опишите проблему подробно (можно приложить фото или голосовое сообщение):",
                 reply_markup=Keyboards.back_and_main()
             )
         else:
             await update.message.reply_text(
-                f"💬 Уточните проблему с {problem_type.lower()}:",
+                f"💬 Уточните проблему с {problem_type.lower()} (можно приложить фото или голосовое сообщение):",
                 reply_markup=Keyboards.back_and_main()
             )
         return PROBLEM_DESCRIPTION
@@ -201,7 +215,73 @@ class TaxiBot:
             context.user_data.clear()
             return ConversationHandler.END
 
-        description = text
+        # Подпись к альбому дополняется текстом или отправляется как есть кнопкой
+        caption = context.user_data.get('caption')
+        if text == "✅ Отправить заявку":
+            if not caption:
+                await update.message.reply_text(
+                    "📝 Опишите проблему текстом:",
+                    reply_markup=Keyboards.back_and_main()
+                )
+                return PROBLEM_DESCRIPTION
+            return await self.save_problem(update, context, caption)
+        if caption:
+            text = f"{caption}\n{text}"
+
+        return await self.save_problem(update, context, text)
+
+    async def get_problem_attachment(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Получаем фото или голосовое сообщение к заявке"""
+        message = update.message
+        if message.photo:
+            kind, attachment = 'photo', message.photo[-1]
+        else:
+            kind, attachment = 'voice', message.voice
+
+        try:
+            telegram_file = await attachment.get_file()
+            sha256 = await self.media_store.save(telegram_file)
+        except Exception as e:
+            logger.error(f"Не удалось сохранить вложение: {e}")
+            await message.reply_text("❌ Не удалось сохранить вложение, попробуйте еще раз")
+            return PROBLEM_DESCRIPTION
+
+        # Файл уже сохранен - без миниатюры вложение все равно оставляем
+        if kind == 'photo':
+            try:
+                await self.media_store.make_thumbnail(sha256)
+            except Exception as e:
+                logger.warning(f"Не удалось создать миниатюру {sha256}: {e}")
+
+        context.user_data.setdefault('attachments', []).append((kind, sha256, attachment.file_id))
+
+        if message.caption:
+            # Подпись к одиночному фото считаем описанием проблемы. Альбом приходит отдельными
+            # сообщениями, подпись обычно у первого - остальные фото придут следом
+            if not message.media_group_id:
+                return await self.save_problem(update, context, message.caption)
+            context.user_data['caption'] = message.caption
+
+        # На альбом отвечаем один раз
+        if message.media_group_id:
+            if message.media_group_id == context.user_data.get('media_group_id'):
+                return PROBLEM_DESCRIPTION
+            context.user_data['media_group_id'] = message.media_group_id
+
+        if context.user_data.get('caption'):
+            await message.reply_text(
+                "📎 Вложения добавлены. Нажмите «✅ Отправить заявку» или дополните описание текстом:",
+                reply_markup=Keyboards.send_problem()
+            )
+        else:
+            await message.reply_text(
+                "📎 Вложение добавлено. Отправьте еще фото или голосовое сообщение, либо опишите проблему текстом:",
+                reply_markup=Keyboards.back_and_main()
+            )
+        return PROBLEM_DESCRIPTION
+
+    async def save_problem(self, update: Update, context: ContextTypes.DEFAULT_TYPE, description: str):
+        """Сохраняем заявку вместе с вложениями"""
         user = update.message.from_user
 
         # Сохраняем проблему в базу
@@ -211,7 +291,8 @@ class TaxiBot:
             car_brand=context.user_data['car_brand'],
             car_number=context.user_data['car_number'],
             problem_type=context.user_data['problem_type'],
-            description=description
+            description=description,
+            attachments=context.user_data.get('attachments', [])
         )
 
         # Уведомляем администратора
@@ -245,9 +326,21 @@ class TaxiBot:
                 chat_id=Config.ADMIN_ID,
                 text=problem_info
             )
+            await self.send_attachments(context.bot, Config.ADMIN_ID, problem_id)
         except Exception as e:
             logger.error(f"Не удалось уведомить администратора: {e}")
 
+    async def send_attachments(self, bot, chat_id: int, problem_id: int) -> int:
+        """Отправляет вложения заявки по сохраненным file_id, без повторной загрузки"""
+        attachments = self.db.get_attachments(problem_id)
+        for kind, _, file_id in attachments:
+            caption = f"📎 Заявка #{problem_id}"
+            if kind == 'photo':
+                await bot.send_photo(chat_id=chat_id, photo=file_id, caption=caption)
+            else:
+                await bot.send_voice(chat_id=chat_id, voice=file_id, caption=caption)
+        return len(attachments)
+
     async def cancel(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Отмена диалога"""
         await update.message.reply_text(
@@ -288,6 +381,32 @@ class TaxiBot:
         stats_text = self.status_manager.get_stats_message()
         await update.message.reply_text(stats_text)
 
+    async def show_report(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Показать отчет по надежности автопарка"""
+        if update.message.from_user.id != Config.ADMIN_ID:
+            return
+
+        # Можно указать месяц: /report 2024-05
+        month = context.args[0] if context.args else None
+        if month and not Analytics.is_valid_month(month):
+            await update.message.reply_text("❌ Укажите месяц в формате ГГГГ-ММ, например: /report 2024-05")
+            return
+
+        report_text = self.analytics.get_report_message(month)
+        await update.message.reply_text(report_text)
+
+    async def create_board(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Закрепить доску актуальных заявок, которая обновляется автоматически"""
+        user_id = update.message.from_user.id
+        if user_id not in Config.ADMIN_IDS:
+            return
+
+        try:
+            await self.board.create(context, user_id)
+        except Exception as e:
+            logger.error(f"Не удалось создать доску: {e}")
+            await update.message.reply_text("❌ Не удалось закрепить доску заявок")
+
     async def show_active_problems(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Показать актуальные проблемы"""
         if update.message.from_user.id != Config.ADMIN_ID:
@@ -375,7 +494,7 @@ class TaxiBot:
 
         if data.startswith('resolve_'):
             # Пометить как решено
-            if self.status_manager.resolve_problem(problem_id):
+            if self.status_manager.resolve_problem(problem_id, user_id):
                 await query.message.reply_text(f"✅ Заявка #{problem_id} отмечена как РЕШЕННАЯ")
 
                 # Обновляем сообщение с заявкой
@@ -387,7 +506,7 @@ class TaxiBot:
 
         elif data.startswith('active_'):
             # Пометить как актуально
-            if self.status_manager.activate_problem(problem_id):
+            if self.status_manager.activate_problem(problem_id, user_id):
                 await query.message.reply_text(f"🔴 Заявка #{problem_id} отмечена как АКТУАЛЬНАЯ")
 
                 # Обновляем сообщение с заявкой
@@ -398,8 +517,13 @@ class TaxiBot:
                 await query.message.reply_text(f"❌ Ошибка при обновлении заявки #{problem_id}")
 
         elif data.startswith('details_'):
-            # Показать подробности (уже показаны)
-            await query.answer("ℹ️ Вы уже просматриваете эту заявку")
+            # Показать вложения, остальные подробности уже показаны
+            try:
+                if not await self.send_attachments(context.bot, query.message.chat_id, problem_id):
+                    await query.answer("ℹ️ Вы уже просматриваете эту заявку")
+            except Exception as e:
+                logger.error(f"Не удалось отправить вложения заявки #{problem_id}: {e}")
+                await query.message.reply_text(f"❌ Не удалось показать вложения заявки #{problem_id}")
 
         elif data.startswith('delete_'):
             # Подтверждение удаления
@@ -454,7 +578,7 @@ class TaxiBot:
             if text_lower.startswith('решить ') or text_lower.startswith('закрыть '):
                 try:
                     problem_id = int(text_lower.split()[1])
-                    if self.status_manager.resolve_problem(problem_id):
+                    if self.status_manager.resolve_problem(problem_id, update.message.from_user.id):
                         await update.message.reply_text(f"✅ Заявка #{problem_id} отмечена как решенная")
                     else:
                         await update.message.reply_text(f"❌ Ошибка при обновлении заявки #{problem_id}")
@@ -463,7 +587,7 @@ class TaxiBot:
             elif text_lower.startswith('открыть '):
                 try:
                     problem_id = int(text_lower.split()[1])
-                    if self.status_manager.activate_problem(problem_id):
+                    if self.status_manager.activate_problem(problem_id, update.message.from_user.id):
                         await update.message.reply_text(f"🔴 Заявка #{problem_id} отмечена как актуальная")
                     else:
                         await update.message.reply_text(f"❌ Ошибка при обновлении заявки #{problem_id}")
@@ -17,4 +17,21 @@ class Config:
     ]
 
     # Марки машин (замените на ваши)
-    CAR_BRANDS = ["Geely", "VESTA", "Granta"]
\ No newline at end of file
+    CAR_BRANDS = ["Geely", "VESTA", "Granta"]
+
+    # Администраторы, получающие напоминания
+    ADMIN_IDS = [ADMIN_ID]
+
+    # Пороги SLA для актуальных заявок (в часах): каждый следующий - новый уровень напоминания
+    SLA_HOURS = {
+        "Двигатель": [2, 6, 24],
+        "Тормоза": [1, 3, 12],
+        "Электроника": [4, 12, 48],
+        "Коробка передач": [2, 6, 24],
+        "Кузов/салон": [24, 72, 168],
+        "Шины/колеса": [2, 6, 24],
+    }
+    DEFAULT_SLA_HOURS = [4, 12, 48]
+
+    # Задержка обновления закрепленной доски заявок (в секундах), изменения за это время объединяются
+    BOARD_DEBOUNCE_SECONDS = 3
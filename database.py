@@ -1,10 +1,13 @@
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timezone
+
+from analytics import Analytics
 
 
 class Database:
     def __init__(self, db_name="taxi_bot.db"):
         self.db_name = db_name
+        self.listeners = []
         self.init_db()
 
     def init_db(self):
@@ -28,11 +31,74 @@ class Database:
             )
         ''')
 
+        # Вложения к заявкам (файлы лежат в MediaStore по хэшу)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS attachments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                problem_id INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                file_id TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_attachments_problem ON attachments (problem_id)
+        ''')
+
+        # Закрепленные доски актуальных заявок администраторов
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS boards (
+                admin_id INTEGER PRIMARY KEY,
+                message_id INTEGER NOT NULL
+            )
+        ''')
+
+        # Журнал изменений заявок (только добавление)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ticket_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                problem_id INTEGER NOT NULL,
+                event TEXT NOT NULL,
+                old_status TEXT NULL,
+                new_status TEXT NOT NULL,
+                actor_id INTEGER NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS ticket_events_no_update BEFORE UPDATE ON ticket_events
+            BEGIN
+                SELECT RAISE(ABORT, 'ticket_events is append-only');
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS ticket_events_no_delete BEFORE DELETE ON ticket_events
+            BEGIN
+                SELECT RAISE(ABORT, 'ticket_events is append-only');
+            END
+        ''')
+
+        # Индекс для выборки заявок по статусу
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_problems_status_created ON problems (status, created_at)
+        ''')
+
+        # Раньше resolved_at писался по местному времени, а created_at - в UTC (CURRENT_TIMESTAMP).
+        # Старые значения отличаются микросекундами - переводим их в UTC
+        cursor.execute('''
+            UPDATE problems SET resolved_at = datetime(resolved_at, 'utc') WHERE resolved_at LIKE '%.%'
+        ''')
+
+        # Сводные таблицы для аналитики
+        Analytics.init_tables(cursor)
+
         conn.commit()
         conn.close()
 
-    def add_problem(self, driver_id, driver_name, car_brand, car_number, problem_type, description):
-        """Добавляем новую проблему"""
+    def add_problem(self, driver_id, driver_name, car_brand, car_number, problem_type, description,
+                    attachments=()):
+        """Добавляем новую проблему. attachments - вложения (вид, sha256, file_id), пишутся в той же транзакции"""
         conn = sqlite3.connect(self.db_name)
         cursor = conn.cursor()
 
@@ -41,10 +107,22 @@ class Database:
             (driver_id, driver_name, car_brand, car_number, problem_type, description)
             VALUES (?, ?, ?, ?, ?, ?)
         ''', (driver_id, driver_name, car_brand, car_number, problem_type, description))
+        problem_id = cursor.lastrowid
+
+        cursor.executemany('''
+            INSERT INTO attachments (problem_id, kind, sha256, file_id)
+            VALUES (?, ?, ?, ?)
+        ''', [(problem_id, kind, sha256, file_id) for kind, sha256, file_id in attachments])
+
+        cursor.execute('SELECT * FROM problems WHERE id = ?', (problem_id,))
+        problem = cursor.fetchone()
+        Analytics.record_created(cursor, car_brand, car_number, problem_type, problem[8])
+        self.add_event(cursor, problem_id, 'created', None, problem[7], driver_id)
 
         conn.commit()
-        problem_id = cursor.lastrowid
         conn.close()
+
+        self.notify_listeners(None, problem)
         return problem_id
 
     def get_problems(self, status=None):
@@ -63,22 +141,115 @@ class Database:
         conn.close()
         return problems
 
-    def update_status(self, problem_id, status):
-        """Обновляем статус проблемы"""
+    def update_status(self, problem_id, status, actor_id=None):
+        """Обновляем статус проблемы. actor_id - ID администратора, изменившего статус"""
         conn = sqlite3.connect(self.db_name)
         cursor = conn.cursor()
 
-        resolved_at = datetime.now() if status == 'решено' else None
+        # В UTC и в формате CURRENT_TIMESTAMP, как created_at
+        resolved_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S') if status == 'решено' else None
+
+        cursor.execute('SELECT * FROM problems WHERE id = ?', (problem_id,))
+        problem = cursor.fetchone()
 
         cursor.execute('''
-            UPDATE problems 
+            UPDATE problems
             SET status = ?, resolved_at = ?
             WHERE id = ?
         ''', (status, resolved_at, problem_id))
 
+        if problem:
+            Analytics.record_status_change(cursor, problem, status, resolved_at)
+            # Повторная установка того же статуса в журнал не пишется
+            if problem[7] != status:
+                self.add_event(cursor, problem_id, 'status', problem[7], status, actor_id)
+
         conn.commit()
         conn.close()
 
+        if problem:
+            self.notify_listeners(problem, problem[:7] + (status, problem[8], resolved_at))
+
+    @staticmethod
+    def add_event(cursor, problem_id, event, old_status, new_status, actor_id):
+        """Записываем событие в журнал (в той же транзакции, что и изменение)"""
+        cursor.execute('''
+            INSERT INTO ticket_events (problem_id, event, old_status, new_status, actor_id)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (problem_id, event, old_status, new_status, actor_id))
+
+    def changes_since(self, cursor_id=0, limit=100):
+        """События после курсора: (события, новый курсор). Курсор - id последнего полученного события"""
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT id, problem_id, event, old_status, new_status, actor_id, created_at
+            FROM ticket_events WHERE id > ? ORDER BY id LIMIT ?
+        ''', (cursor_id, limit))
+
+        events = cursor.fetchall()
+        conn.close()
+        return events, (events[-1][0] if events else cursor_id)
+
+    def get_attachments(self, problem_id):
+        """Получаем вложения заявки"""
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT kind, sha256, file_id FROM attachments WHERE problem_id = ? ORDER BY id
+        ''', (problem_id,))
+
+        attachments = cursor.fetchall()
+        conn.close()
+        return attachments
+
+    def set_board(self, admin_id, message_id):
+        """Запоминаем сообщение-доску администратора"""
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            INSERT OR REPLACE INTO boards (admin_id, message_id) VALUES (?, ?)
+        ''', (admin_id, message_id))
+
+        conn.commit()
+        conn.close()
+
+    def delete_board(self, admin_id):
+        """Удаляем сообщение-доску администратора"""
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+
+        cursor.execute('DELETE FROM boards WHERE admin_id = ?', (admin_id,))
+
+        conn.commit()
+        conn.close()
+
+    def get_boards(self):
+        """Получаем доски администраторов: {admin_id: message_id}"""
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT admin_id, message_id FROM boards')
+
+        boards = dict(cursor.fetchall())
+        conn.close()
+        return boards
+
+    def add_listener(self, callback):
+        """Подписываемся на изменения заявок: callback(старая_строка, новая_строка)"""
+        self.listeners.append(callback)
+
+    def notify_listeners(self, old_problem, new_problem):
+        """Уведомляем подписчиков об изменении заявки"""
+        for callback in self.listeners:
+            try:
+                callback(old_problem, new_problem)
+            except Exception as e:
+                print(f"Ошибка в обработчике изменений заявки #{new_problem[0]}: {e}")
+
     def get_stats(self):
         """Статистика по проблемам"""
         conn = sqlite3.connect(self.db_name)
@@ -0,0 +1,151 @@
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.jobstores.base import JobLookupError
+from telegram.ext import Application, ContextTypes
+
+from config import Config
+from database import Database
+from keyboards import Keyboards
+
+logger = logging.getLogger(__name__)
+
+
+class EscalationEngine:
+    """Напоминания администраторам о заявках, которые слишком долго остаются актуальными"""
+
+    def __init__(self, db: Database, application: Application):
+        self.db = db
+        self.application = application
+        self.heap = []  # (срок, id заявки, уровень)
+        self.active = {}  # id заявки -> (заявка, начало отсчета, текущий уровень)
+        self.job = None
+        self.job_due = None
+        self.db.add_listener(self.on_problem_changed)
+
+    @staticmethod
+    def thresholds(problem_type: str) -> list:
+        """Пороги SLA для типа проблемы"""
+        return Config.SLA_HOURS.get(problem_type, Config.DEFAULT_SLA_HOURS)
+
+    @staticmethod
+    def parse_time(value) -> datetime:
+        """Время из базы (CURRENT_TIMESTAMP, UTC)"""
+        return datetime.fromisoformat(str(value)).replace(tzinfo=timezone.utc)
+
+    def start(self):
+        """Строим очередь сроков по актуальным заявкам"""
+        now = datetime.now(timezone.utc)
+        self.heap.clear()
+        self.active.clear()
+
+        for problem in self.db.get_problems('актуально'):
+            started_at = self.parse_time(problem[8])
+            passed = sum(1 for hours in self.thresholds(problem[5]) if started_at + timedelta(hours=hours) <= now)
+            # Напоминания о пройденных уровнях скорее всего уже отправлены до перезапуска -
+            # продолжаем со следующего уровня
+            self.track(problem, started_at, passed)
+
+        self.schedule()
+
+    def track(self, problem: tuple, started_at: datetime, tier: int):
+        """Ставим заявку в очередь на следующий уровень напоминания"""
+        thresholds = self.thresholds(problem[5])
+        if tier >= len(thresholds):
+            self.active.pop(problem[0], None)
+            return
+
+        self.active[problem[0]] = (problem, started_at, tier)
+        heapq.heappush(self.heap, (started_at + timedelta(hours=thresholds[tier]), problem[0], tier))
+
+    def is_current(self, entry: tuple) -> bool:
+        """Запись в очереди не устарела (заявка актуальна и уровень не сменился)"""
+        _, problem_id, tier = entry
+        return problem_id in self.active and self.active[problem_id][2] == tier
+
+    def on_problem_changed(self, old_problem, new_problem):
+        """Обновляем очередь при создании заявки или смене статуса"""
+        problem_id, status = new_problem[0], new_problem[7]
+
+        if status == 'актуально':
+            if problem_id in self.active:
+                return
+            # Новая заявка считается с момента создания, открытая повторно - с текущего момента
+            if old_problem is None:
+                started_at = self.parse_time(new_problem[8])
+            else:
+                started_at = datetime.now(timezone.utc)
+            self.track(new_problem, started_at, 0)
+        else:
+            # Запись в очереди останется, но будет пропущена как устаревшая
+            self.active.pop(problem_id, None)
+
+        self.schedule()
+
+    def schedule(self):
+        """Планируем пробуждение на ближайший срок"""
+        while self.heap and not self.is_current(self.heap[0]):
+            heapq.heappop(self.heap)
+
+        due = self.heap[0][0] if self.heap else None
+        if self.job and self.job_due == due:
+            return
+        if self.job:
+            try:
+                self.job.schedule_removal()
+            except JobLookupError:
+                # Задача уже выполнена или удалена планировщиком
+                pass
+            self.job = None
+
+        self.job_due = due
+        if due:
+            # Прошедший срок планируем на текущий момент, иначе планировщик сочтет задачу пропущенной
+            self.job = self.application.job_queue.run_once(
+                self.check_deadlines, when=max(due, datetime.now(timezone.utc)), name="sla_escalation",
+                job_kwargs={'misfire_grace_time': None}
+            )
+
+    async def check_deadlines(self, context: ContextTypes.DEFAULT_TYPE):
+        """Отправляем напоминания по наступившим срокам"""
+        self.job = None
+        now = datetime.now(timezone.utc)
+
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            if not self.is_current(entry):
+                continue
+
+            problem, started_at, tier = self.active[entry[1]]
+            # Следующий уровень ставим до отправки: пока идет отправка, заявку могут решить или
+            # открыть заново, и это изменение не должно быть перезаписано
+            self.track(problem, started_at, tier + 1)
+            await self.send_reminder(context, problem, tier, now - started_at)
+
+        self.schedule()
+
+    async def send_reminder(self, context: ContextTypes.DEFAULT_TYPE, problem: tuple, tier: int, age: timedelta):
+        """Напоминание администраторам"""
+        problem_id, _, driver_name, car_brand, car_number, problem_type = problem[:6]
+        hours = int(age.total_seconds() // 3600)
+        level_icon = "⚠️" if tier == 0 else "🔥" * tier
+
+        message = f"""
+{level_icon} НАПОМИНАНИЕ (уровень {tier + 1})
+
+Заявка #{problem_id} актуальна уже {hours} ч
+👤 Водитель: {driver_name}
+🚗 Автомобиль: {car_brand} {car_number}
+📋 Тип проблемы: {problem_type}
+"""
+
+        for admin_id in Config.ADMIN_IDS:
+            try:
+                await context.bot.send_message(
+                    chat_id=admin_id,
+                    text=message,
+                    reply_markup=Keyboards.admin_problem_actions(problem_id)
+                )
+            except Exception as e:
+                logger.error(f"Не удалось отправить напоминание по заявке #{problem_id}: {e}")
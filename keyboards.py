@@ -35,6 +35,11 @@ class Keyboards:
         """Кнопки Назад и Главное меню"""
         return ReplyKeyboardMarkup([["◀️ Назад", "🏠 Главное меню"]], resize_keyboard=True)
 
+    @staticmethod
+    def send_problem():
+        """Отправка заявки с подписью к вложениям"""
+        return ReplyKeyboardMarkup([["✅ Отправить заявку"], ["◀️ Назад", "🏠 Главное меню"]], resize_keyboard=True)
+
     @staticmethod
     def admin_menu():
         """Меню администратора"""
@@ -0,0 +1,79 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+from PIL import Image
+from telegram import File
+
+
+def make_thumbnail(source_path: str, thumbnail_path: str, size: int):
+    """Создаем миниатюру изображения (выполняется в отдельном процессе)"""
+    with Image.open(source_path) as image:
+        image.thumbnail((size, size))
+        image.convert("RGB").save(thumbnail_path, "JPEG", quality=80)
+
+
+class MediaStore:
+    """Локальное хранилище вложений с адресацией по SHA-256 содержимого"""
+
+    CHUNK_SIZE = 64 * 1024
+    THUMBNAIL_SIZE = 320
+
+    def __init__(self, root="media"):
+        self.root = root
+        self.pool = ProcessPoolExecutor(max_workers=2)
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, sha256: str) -> str:
+        """Путь к файлу по хэшу содержимого"""
+        return os.path.join(self.root, sha256[:2], sha256)
+
+    def thumbnail_path_for(self, sha256: str) -> str:
+        """Путь к миниатюре по хэшу содержимого"""
+        return self.path_for(sha256) + ".thumb.jpg"
+
+    async def save(self, telegram_file: File) -> str:
+        """Скачиваем файл частями, считая хэш на лету. Возвращает SHA-256 содержимого"""
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+
+        try:
+            with os.fdopen(fd, "wb") as out:
+                async with httpx.AsyncClient() as client:
+                    async with client.stream("GET", telegram_file.file_path) as response:
+                        response.raise_for_status()
+                        async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
+                            digest.update(chunk)
+                            out.write(chunk)
+        except httpx.HTTPError as e:
+            os.remove(tmp_path)
+            # URL файла содержит токен бота - в текст ошибки его не пропускаем
+            if isinstance(e, httpx.HTTPStatusError):
+                raise RuntimeError(f"Bot API вернул статус {e.response.status_code}") from None
+            raise RuntimeError(f"Ошибка загрузки файла: {type(e).__name__}") from None
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+        sha256 = digest.hexdigest()
+        path = self.path_for(sha256)
+        if os.path.exists(path):
+            # Такой файл уже есть в хранилище
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        return sha256
+
+    async def make_thumbnail(self, sha256: str) -> str:
+        """Создаем миниатюру в пуле процессов, не блокируя цикл событий"""
+        thumbnail_path = self.thumbnail_path_for(sha256)
+        if not os.path.exists(thumbnail_path):
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                self.pool, make_thumbnail, self.path_for(sha256), thumbnail_path, self.THUMBNAIL_SIZE
+            )
+        return thumbnail_path
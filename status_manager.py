@@ -6,19 +6,19 @@ class StatusManager:
     def __init__(self, db: Database):
         self.db = db
 
-    def resolve_problem(self, problem_id: int) -> bool:
+    def resolve_problem(self, problem_id: int, actor_id: int = None) -> bool:
         """Пометить проблему как решенную"""
         try:
-            self.db.update_status(problem_id, 'решено')
+            self.db.update_status(problem_id, 'решено', actor_id)
             return True
         except Exception as e:
             print(f"Ошибка при решении проблемы #{problem_id}: {e}")
             return False
 
-    def activate_problem(self, problem_id: int) -> bool:
+    def activate_problem(self, problem_id: int, actor_id: int = None) -> bool:
         """Пометить проблему как актуальную"""
         try:
-            self.db.update_status(problem_id, 'актуально')
+            self.db.update_status(problem_id, 'актуально', actor_id)
             return True
         except Exception as e:
             print(f"Ошибка при активации проблемы #{problem_id}: {e}")
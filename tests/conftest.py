@@ -0,0 +1,26 @@
+import sqlite3
+
+import pytest
+
+from database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / "taxi_bot.db"))
+
+
+@pytest.fixture
+def add_problem(db):
+    """Добавляет заявку; minutes_ago сдвигает created_at в прошлое"""
+    def add(minutes_ago=0, car_number="A001AA", problem_type="Тормоза"):
+        problem_id = db.add_problem(1, "Иван", "Geely", car_number, problem_type, "скрипят")
+        if minutes_ago:
+            conn = sqlite3.connect(db.db_name)
+            conn.execute(f"UPDATE problems SET created_at = datetime('now', '-{minutes_ago} minutes') WHERE id = ?",
+                         (problem_id,))
+            conn.commit()
+            conn.close()
+        return problem_id
+
+    return add
@@ -0,0 +1,116 @@
+import sqlite3
+import time
+
+import pytest
+
+from analytics import Analytics
+from database import Database
+
+
+@pytest.fixture
+def moscow_tz(monkeypatch):
+    monkeypatch.setenv("TZ", "Europe/Moscow")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def histogram(db):
+    conn = sqlite3.connect(db.db_name)
+    rows = dict(conn.execute('SELECT bucket, tickets FROM resolution_histogram WHERE tickets != 0'))
+    conn.close()
+    return rows
+
+
+def test_resolution_time_bucket(db, add_problem):
+    problem_id = add_problem(minutes_ago=90)
+
+    db.update_status(problem_id, 'решено')
+
+    assert histogram(db) == {Analytics.RESOLUTION_BUCKETS.index(120): 1}
+
+
+def test_immediate_resolution_outside_utc(db, add_problem, moscow_tz):
+    problem_id = add_problem()
+
+    db.update_status(problem_id, 'решено')
+
+    assert histogram(db) == {0: 1}
+    assert Analytics(db.db_name).get_report()['percentiles'][50] == Analytics.RESOLUTION_BUCKETS[0]
+
+
+def test_reopen_removes_resolution(db, add_problem):
+    problem_id = add_problem()
+    db.update_status(problem_id, 'решено')
+
+    db.update_status(problem_id, 'актуально')
+
+    assert histogram(db) == {}
+
+
+def test_local_resolved_at_migrated_to_utc(tmp_path, moscow_tz):
+    db_name = str(tmp_path / "taxi_bot.db")
+    conn = sqlite3.connect(db_name)
+    conn.execute('''
+        CREATE TABLE problems (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, driver_id INTEGER NOT NULL, driver_name TEXT NOT NULL,
+            car_brand TEXT NOT NULL, car_number TEXT NOT NULL, problem_type TEXT NOT NULL,
+            description TEXT NOT NULL, status TEXT DEFAULT 'актуально',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, resolved_at TIMESTAMP NULL
+        )
+    ''')
+    # Решена через 10 минут, resolved_at записан по московскому времени (UTC+3)
+    conn.execute('''
+        INSERT INTO problems (driver_id, driver_name, car_brand, car_number, problem_type, description,
+                              status, created_at, resolved_at)
+        VALUES (1, 'Иван', 'Geely', 'A001AA', 'Тормоза', 'скрипят', 'решено',
+                '2024-05-01 10:00:00', '2024-05-01 13:10:00.123456')
+    ''')
+    conn.commit()
+    conn.close()
+
+    db = Database(db_name)
+
+    assert db.get_problems()[0][9] == '2024-05-01 10:10:00'
+    assert histogram(db) == {0: 1}
+
+
+def test_percentiles():
+    counts = {0: 5, 3: 4, len(Analytics.RESOLUTION_BUCKETS): 1}
+
+    assert Analytics.percentiles(counts) == {50: 15, 90: 120, 95: None}
+    assert Analytics.percentiles({}) == {}
+
+
+def test_report_tickets_per_car(db, add_problem):
+    for car_number in ("A001AA", "A001AA", "B002BB"):
+        add_problem(car_number=car_number)
+
+    report = Analytics(db.db_name).get_report()
+
+    assert report['top_cars'] == [("A001AA", 2), ("B002BB", 1)]
+    assert report['tickets_per_car'] == 1.5
+    assert report['repeat_failures'] == [("Geely", "A001AA", "Тормоза", 2)]
+
+
+def test_report_daily_trend(db, add_problem):
+    first_id = add_problem()
+    add_problem()
+    db.update_status(first_id, 'решено')
+
+    report = Analytics(db.db_name).get_report()
+
+    assert [(created, resolved) for _, created, resolved in report['daily']] == [(2, 1)]
+    assert report['daily'][0][0].startswith(report['month'])
+
+
+@pytest.mark.parametrize("month, valid", [
+    ("2024-05", True),
+    ("2024-12", True),
+    ("2024-5", False),
+    ("2024-13", False),
+    ("foo", False),
+])
+def test_is_valid_month(month, valid):
+    assert Analytics.is_valid_month(month) is valid
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from telegram.error import BadRequest
+from telegram.ext import Application, ExtBot
+
+from board import ActiveBoard
+from config import Config
+
+
+@pytest.fixture
+def edits(monkeypatch):
+    """Вызовы edit_message_text; ошибки из errors[chat_id] выбрасываются по очереди"""
+    calls, errors = [], {}
+
+    async def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        calls.append((chat_id, message_id, text))
+        if errors.get(chat_id):
+            raise errors[chat_id].pop(0)
+
+    monkeypatch.setattr(ExtBot, "edit_message_text", edit_message_text)
+    monkeypatch.setattr(Config, "BOARD_DEBOUNCE_SECONDS", 0.2)
+    return calls, errors
+
+
+def run_board(db, scenario):
+    """Создает доску при запущенной очереди задач и выполняет сценарий"""
+    async def run():
+        application = Application.builder().token("123:TEST").build()
+        board = ActiveBoard(db, application)
+        await application.job_queue.start()
+        try:
+            await scenario(board)
+        finally:
+            await application.job_queue.stop(wait=False)
+
+    asyncio.run(run())
+
+
+def test_stale_board_refreshed_at_startup(db, add_problem, edits):
+    calls, _ = edits
+    add_problem()
+    db.set_board(1, 10)
+
+    async def scenario(board):
+        await asyncio.sleep(0.3)
+
+    run_board(db, scenario)
+
+    assert len(calls) == 1
+    assert "#1 " in calls[0][2]
+
+
+def test_burst_of_changes_is_one_edit(db, add_problem, edits):
+    calls, _ = edits
+    db.set_board(1, 10)
+
+    async def scenario(board):
+        await asyncio.sleep(0.3)
+        calls.clear()
+
+        for car in range(30):
+            add_problem(car_number=f"A{car:03}AA")
+        await asyncio.sleep(0.5)
+
+    run_board(db, scenario)
+
+    assert len(calls) == 1
+    assert "(30)" in calls[0][2]
+
+
+def test_unchanged_content_is_not_edited(db, add_problem, edits):
+    calls, _ = edits
+    problem_id = add_problem()
+    db.set_board(1, 10)
+
+    async def scenario(board):
+        await asyncio.sleep(0.3)
+        calls.clear()
+
+        db.update_status(problem_id, 'решено')
+        db.update_status(problem_id, 'актуально')
+        await asyncio.sleep(0.5)
+
+    run_board(db, scenario)
+
+    assert calls == []
+
+
+def test_deleted_board_is_dropped(db, add_problem, edits):
+    calls, errors = edits
+    db.set_board(1, 10)
+    db.set_board(2, 20)
+    errors[2] = [BadRequest("Bad Request: message to edit not found")]
+
+    async def scenario(board):
+        await asyncio.sleep(0.3)
+        assert list(board.boards) == [1]
+
+        add_problem()
+        await asyncio.sleep(0.5)
+
+    run_board(db, scenario)
+
+    assert db.get_boards() == {1: 10}
+    assert [chat_id for chat_id, _, _ in calls] == [1, 2, 1]
@@ -0,0 +1,54 @@
+import sqlite3
+
+import pytest
+
+
+def test_changes_since_returns_only_new_events(db, add_problem):
+    problem_id = add_problem()
+    db.update_status(problem_id, 'решено', actor_id=42)
+
+    events, cursor = db.changes_since()
+    assert [(e[2], e[3], e[4], e[5]) for e in events] == [
+        ('created', None, 'актуально', 1),
+        ('status', 'актуально', 'решено', 42),
+    ]
+
+    db.update_status(problem_id, 'актуально', actor_id=42)
+    events, next_cursor = db.changes_since(cursor)
+    assert [(e[3], e[4]) for e in events] == [('решено', 'актуально')]
+    assert db.changes_since(next_cursor) == ([], next_cursor)
+
+
+def test_same_status_is_not_logged(db, add_problem):
+    problem_id = add_problem()
+    db.update_status(problem_id, 'решено', actor_id=42)
+    _, cursor = db.changes_since()
+
+    db.update_status(problem_id, 'решено', actor_id=42)
+
+    assert db.changes_since(cursor) == ([], cursor)
+
+
+@pytest.mark.parametrize("statement", [
+    "UPDATE ticket_events SET actor_id = 0",
+    "DELETE FROM ticket_events",
+])
+def test_events_are_append_only(db, add_problem, statement):
+    add_problem()
+    conn = sqlite3.connect(db.db_name)
+
+    with pytest.raises(sqlite3.IntegrityError, match="append-only"):
+        conn.execute(statement)
+    conn.close()
+
+
+def test_attachments_saved_with_problem(db):
+    seen = []
+    db.add_listener(lambda old, new: seen.append(db.get_attachments(new[0])))
+    attachments = [('photo', 'a' * 64, 'photo-file-id'), ('voice', 'b' * 64, 'voice-file-id')]
+
+    problem_id = db.add_problem(1, "Иван", "Geely", "A001AA", "Тормоза", "скрипят", attachments=attachments)
+
+    assert db.get_attachments(problem_id) == attachments
+    # Подписчики видят заявку уже вместе с вложениями
+    assert seen == [attachments]
@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from telegram.ext import Application
+
+from config import Config
+from escalation import EscalationEngine
+
+
+@pytest.fixture(autouse=True)
+def sla(monkeypatch):
+    monkeypatch.setattr(Config, "SLA_HOURS", {"Тормоза": [1, 2, 24]})
+
+
+@pytest.fixture
+def engine(db):
+    application = Application.builder().token("123:TEST").build()
+    return EscalationEngine(db, application)
+
+
+def test_restart_resumes_after_passed_tiers(db, add_problem, engine):
+    overdue_id = add_problem(minutes_ago=150)
+    expired_id = add_problem(minutes_ago=2 * 24 * 60)
+
+    engine.start()
+
+    problem, started_at, tier = engine.active[overdue_id]
+    assert tier == 2
+    assert expired_id not in engine.active
+    assert engine.job is not None
+    assert engine.job_due == started_at + timedelta(hours=24)
+
+
+def test_reopen_restarts_sla_clock(db, add_problem, engine):
+    problem_id = add_problem(minutes_ago=3 * 24 * 60)
+    db.update_status(problem_id, 'решено')
+    assert problem_id not in engine.active
+
+    db.update_status(problem_id, 'актуально')
+
+    _, started_at, tier = engine.active[problem_id]
+    assert tier == 0
+    assert datetime.now(timezone.utc) - started_at < timedelta(minutes=1)
+
+
+def test_overdue_deadline_fires_and_scheduling_continues(db, add_problem, engine):
+    sent = []
+
+    async def send_reminder(context, problem, tier, age):
+        sent.append((problem[0], tier))
+
+    engine.send_reminder = send_reminder
+
+    async def run():
+        job_queue = engine.application.job_queue
+        await job_queue.start()
+        try:
+            problem_id = add_problem()
+            problem = db.get_problems()[0]
+            # Срок первого уровня уже прошел
+            engine.track(problem, datetime.now(timezone.utc) - timedelta(hours=1, minutes=30), 0)
+            engine.schedule()
+            await asyncio.sleep(0.5)
+            assert sent == [(problem_id, 0)]
+            assert engine.active[problem_id][2] == 1
+
+            # После срабатывания задачи очередь продолжает планироваться
+            db.update_status(problem_id, 'решено')
+            new_id = add_problem()
+            assert engine.job is not None
+            assert engine.job_due == engine.active[new_id][1] + timedelta(hours=1)
+        finally:
+            await job_queue.stop(wait=False)
+
+    asyncio.run(run())
+
+
+def run_overdue_reminder(db, add_problem, engine, on_send):
+    """Отправляет напоминание по просроченной заявке, on_send выполняется во время отправки"""
+    problem_id = add_problem()
+    problem = db.get_problems()[0]
+    engine.track(problem, datetime.now(timezone.utc) - timedelta(hours=1, minutes=30), 0)
+
+    async def send_reminder(context, problem, tier, age):
+        on_send(problem[0])
+
+    engine.send_reminder = send_reminder
+    asyncio.run(engine.check_deadlines(None))
+    return problem_id
+
+
+def test_resolve_during_reminder_stops_escalation(db, add_problem, engine):
+    problem_id = run_overdue_reminder(db, add_problem, engine,
+                                      lambda pid: db.update_status(pid, 'решено'))
+
+    assert db.get_problems()[0][7] == 'решено'
+    assert problem_id not in engine.active
+
+
+def test_reopen_during_reminder_restarts_sla_clock(db, add_problem, engine):
+    def resolve_and_reopen(pid):
+        db.update_status(pid, 'решено')
+        db.update_status(pid, 'актуально')
+
+    problem_id = run_overdue_reminder(db, add_problem, engine, resolve_and_reopen)
+
+    _, started_at, tier = engine.active[problem_id]
+    assert tier == 0
+    assert datetime.now(timezone.utc) - started_at < timedelta(minutes=1)
@@ -0,0 +1,64 @@
+import asyncio
+import functools
+import os
+import threading
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from types import SimpleNamespace
+
+import pytest
+
+from media_store import MediaStore
+
+
+@pytest.fixture
+def file_server(tmp_path):
+    """HTTP-сервер, отдающий файлы из временного каталога вместо Bot API"""
+    served = tmp_path / "served"
+    served.mkdir()
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=str(served))
+    server = HTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield served, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MediaStore(str(tmp_path / "media"))
+    yield store
+    store.pool.shutdown()
+
+
+def save(store, url):
+    return asyncio.run(store.save(SimpleNamespace(file_path=url)))
+
+
+def stored_files(store):
+    return sorted(os.path.relpath(os.path.join(root, name), store.root)
+                  for root, _, names in os.walk(store.root) for name in names)
+
+
+def test_identical_files_stored_once(store, file_server):
+    served, base_url = file_server
+    content = os.urandom(3 * MediaStore.CHUNK_SIZE + 123)
+    (served / "first.jpg").write_bytes(content)
+    (served / "second.jpg").write_bytes(content)
+
+    first = save(store, f"{base_url}/first.jpg")
+    second = save(store, f"{base_url}/second.jpg")
+
+    assert first == second
+    assert stored_files(store) == [os.path.relpath(store.path_for(first), store.root)]
+    with open(store.path_for(first), "rb") as stored:
+        assert stored.read() == content
+
+
+def test_failed_download_removes_temp_file(store, file_server):
+    _, base_url = file_server
+
+    with pytest.raises(RuntimeError, match="404"):
+        save(store, f"{base_url}/missing.jpg")
+
+    assert stored_files(store) == []